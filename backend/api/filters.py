@@ -1,19 +1,46 @@
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import Lower
 from django_filters import AllValuesMultipleFilter, rest_framework
 from django_filters.widgets import BooleanWidget
-from recipes.models import Recipe
+from recipes.models import Cart, Favorite, Recipe
 from rest_framework.filters import SearchFilter
 
 
 class IngredientSearchFilter(SearchFilter):
     search_param = 'name'
 
+    def filter_queryset(self, request, queryset, view):
+        name = request.query_params.get(self.search_param, '').strip()
+        if not name:
+            return queryset
+        return queryset.alias(lower_name=Lower('name')).filter(
+            lower_name__startswith=name.lower())
+
 
 class RecipeFilter(rest_framework.FilterSet):
-    is_in_shopping_cart = rest_framework.BooleanFilter(widget=BooleanWidget())
-    is_favorited = rest_framework.BooleanFilter(widget=BooleanWidget())
+    is_in_shopping_cart = rest_framework.BooleanFilter(
+        widget=BooleanWidget(), method='filter_is_in_shopping_cart')
+    is_favorited = rest_framework.BooleanFilter(
+        widget=BooleanWidget(), method='filter_is_favorited')
     tags = AllValuesMultipleFilter(field_name='tags__slug')
     author = AllValuesMultipleFilter(field_name='author__id')
 
     class Meta:
         model = Recipe
         fields = ['author__id', 'tags__slug']
+
+    def filter_is_favorited(self, queryset, name, value):
+        return self.filter_user_list(queryset, Favorite, value)
+
+    def filter_is_in_shopping_cart(self, queryset, name, value):
+        return self.filter_user_list(queryset, Cart, value)
+
+    def filter_user_list(self, queryset, model, value):
+        user = self.request.user
+        if user.is_anonymous:
+            return queryset.none() if value else queryset
+        in_list = Exists(model.objects.filter(
+            user=user, recipe=OuterRef('pk')))
+        if value:
+            return queryset.filter(in_list)
+        return queryset.exclude(in_list)
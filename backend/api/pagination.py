@@ -1,6 +1,55 @@
-from rest_framework.pagination import PageNumberPagination
+from hashlib import md5
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+COUNT_CACHE_TIMEOUT = 300
 
 
 class LimitPageNumberPagination(PageNumberPagination):
     page_size = 6
     page_size_query_param = 'limit'
+
+
+class RecipeCursorPagination(CursorPagination):
+    page_size = 6
+    page_size_query_param = 'limit'
+    ordering = ('-pub_date', '-id')
+
+
+class CachedCountPaginator(Paginator):
+    def __init__(self, *args, cache_key=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_key = cache_key
+
+    @cached_property
+    def count(self):
+        count = cache.get(self.cache_key)
+        if count is None:
+            count = super().count
+            cache.set(self.cache_key, count, COUNT_CACHE_TIMEOUT)
+        return count
+
+
+class CachedCountPagination(LimitPageNumberPagination):
+    def django_paginator_class(self, queryset, page_size):
+        return CachedCountPaginator(
+            queryset, page_size, cache_key=self.count_cache_key)
+
+    def get_count_cache_key(self, request):
+        params = sorted(
+            (key, sorted(values))
+            for key, values in request.query_params.lists()
+            if key not in (self.page_query_param, self.page_size_query_param)
+        )
+        signature = f'{request.user.id}:{params}'.encode()
+        return (f'{request.resolver_match.view_name}:count:'
+                f'{md5(signature).hexdigest()}')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_cache_key = self.get_count_cache_key(request)
+        if request.query_params.get(self.page_query_param, '1') == '1':
+            cache.delete(self.count_cache_key)
+        return super().paginate_queryset(queryset, request, view)
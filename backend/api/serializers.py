@@ -59,6 +59,9 @@ class CustomUserSerializer(UserSerializer):
         user = self.context.get('request').user
         if user.is_anonymous:
             return False
+        subscribed_ids = self.context.get('subscribed_ids')
+        if subscribed_ids is not None:
+            return obj.id in subscribed_ids
         return Follow.objects.filter(user=user, author=obj.id).exists()
 
 
@@ -76,9 +79,15 @@ class RecipeReadSerializer(serializers.ModelSerializer):
                   'text', 'cooking_time',)
 
     def get_ingredients(self, obj):
-        return obj.ingredients.values(
-            'id', 'name', 'measurement_unit', amount=F('recipe__amount')
-        )
+        return [
+            {
+                'id': item.ingredients.id,
+                'name': item.ingredients.name,
+                'measurement_unit': item.ingredients.measurement_unit,
+                'amount': item.amount,
+            }
+            for item in obj.ingredient.all()
+        ]
 
 
 class RecipeWriteSerializer(serializers.ModelSerializer):
@@ -183,17 +192,17 @@ class FollowSerializer(serializers.ModelSerializer):
                   'is_subscribed', 'recipes', 'recipes_count')
 
     def get_is_subscribed(self, obj):
-        return Follow.objects.filter(
-            user=obj.user, author=obj.author
-        ).exists()
+        return True
 
     def get_recipes(self, obj):
         request = self.context.get('request')
         limit = request.GET.get('recipes_limit')
-        queryset = Recipe.objects.filter(author=obj.author)
+        queryset = obj.author.recipes.all()
         if limit:
             queryset = queryset[:int(limit)]
         return ShortRecipeSerializer(queryset, many=True).data
 
     def get_recipes_count(self, obj):
-        return Recipe.objects.filter(author=obj.author).count()
+        if hasattr(obj, 'recipes_count'):
+            return obj.recipes_count
+        return obj.author.recipes.count()
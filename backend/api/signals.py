@@ -0,0 +1,13 @@
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from recipes.models import Tag
+
+TAG_LIST_CACHE_KEY = 'tags:list'
+TAG_LIST_CACHE_TIMEOUT = 300
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def clear_tag_list_cache(**kwargs):
+    cache.delete(TAG_LIST_CACHE_KEY)
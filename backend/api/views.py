@@ -2,41 +2,67 @@ from http import HTTPStatus
 from datetime import datetime
 
 from django.contrib.auth import get_user_model
-from django.db.models import BooleanField, Exists, OuterRef, Sum, Value
-from django.http import HttpResponse
+from django.core.cache import cache
+from django.db.models import (BooleanField, Case, Count, Exists, OuterRef,
+                              Prefetch, Sum, Value, When)
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
 from rest_framework.status import HTTP_400_BAD_REQUEST
 from djoser.views import UserViewSet
 from rest_framework import viewsets
 from rest_framework.decorators import action
-from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from recipes.models import (Cart, Favorite, Ingredient, IngredientAmount,
                             Recipe, Tag)
 from users.models import Follow
 from .filters import IngredientSearchFilter, RecipeFilter
-from .pagination import LimitPageNumberPagination
+from .pagination import (CachedCountPagination, LimitPageNumberPagination,
+                         RecipeCursorPagination)
 from .permissions import AdminOrReadOnly, AdminUserOrReadOnly
 from .serializers import (FollowSerializer, IngredientSerializer,
                           RecipeReadSerializer, RecipeWriteSerializer,
                           ShortRecipeSerializer, TagSerializer)
+from .signals import TAG_LIST_CACHE_KEY, TAG_LIST_CACHE_TIMEOUT
 
 User = get_user_model()
 
+FLAG_RECIPE_IDS_LIMIT = 1000
+RECIPE_LIST_FIELDS = (
+    'id', 'name', 'image', 'text', 'cooking_time', 'pub_date', 'author',
+    'author__email', 'author__username', 'author__first_name',
+    'author__last_name',
+)
 
+
+@method_decorator(
+    cache_control(public=True, max_age=TAG_LIST_CACHE_TIMEOUT), name='list')
 class TagsViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = (AdminOrReadOnly,)
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
 
+    def list(self, request, *args, **kwargs):
+        data = cache.get(TAG_LIST_CACHE_KEY)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(TAG_LIST_CACHE_KEY, data, TAG_LIST_CACHE_TIMEOUT)
+        return Response(data)
+
 
 class IngredientsViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = (AdminOrReadOnly,)
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     filter_backends = (IngredientSearchFilter,)
-    search_fields = ('^name',)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(
+            self.get_queryset().values('id', 'name', 'measurement_unit'))
+        return Response(list(queryset))
 
 
 class FollowViewSet(UserViewSet):
@@ -52,36 +78,44 @@ class FollowViewSet(UserViewSet):
             return Response({
                 'errors': 'Ошибка подписки, нельзя подписываться на себя'},
                 status=HTTPStatus.BAD_REQUEST)
-        if Follow.objects.filter(user=user, author=author).exists():
+        follow, created = Follow.objects.get_or_create(
+            user=user, author=author)
+        if not created:
             return Response({
                 'errors': 'Ошибка подписки, вы уже подписаны на пользователя'},
                 status=HTTPStatus.BAD_REQUEST)
 
-        follow = Follow.objects.create(user=user, author=author)
         serializer = FollowSerializer(follow, context={'request': request})
         return Response(serializer.data, status=HTTPStatus.CREATED)
 
     @subscribe.mapping.delete
     def del_subscribe(self, request, id=None):
         user = request.user
-        author = get_object_or_404(User, id=id)
-        if user == author:
+        if str(user.id) == id:
             return Response(
                 {'errors':
                     'Ошибка отписки, нельзя отписываться от самого себя'},
                 status=HTTPStatus.BAD_REQUEST)
-        follow = Follow.objects.filter(user=user, author=author)
-        if not follow.exists():
+        deleted, _ = Follow.objects.filter(user=user, author_id=id).delete()
+        if not deleted:
+            get_object_or_404(User, id=id)
             return Response({
                 'errors': 'Ошибка отписки, вы уже отписались'},
                 status=HTTPStatus.BAD_REQUEST)
-        follow.delete()
         return Response(status=HTTPStatus.NO_CONTENT)
 
     @action(detail=False, permission_classes=[IsAuthenticated])
     def subscriptions(self, request):
         user = request.user
-        queryset = Follow.objects.filter(user=user)
+        queryset = Follow.objects.filter(user=user).select_related(
+            'author'
+        ).prefetch_related(
+            Prefetch(
+                'author__recipes',
+                queryset=Recipe.objects.only(
+                    'id', 'name', 'image', 'cooking_time', 'author')
+            )
+        ).annotate(recipes_count=Count('author__recipes')).order_by('-id')
         pages = self.paginate_queryset(queryset)
         serializer = FollowSerializer(
             pages, many=True,
@@ -92,27 +126,69 @@ class FollowViewSet(UserViewSet):
 
 class RecipeViewSet(viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
-    pagination_class = LimitPageNumberPagination
+    pagination_class = CachedCountPagination
+    cursor_pagination_class = RecipeCursorPagination
     filter_class = RecipeFilter
     permission_classes = (AdminUserOrReadOnly,)
+    serializer_classes = {
+        'list': RecipeReadSerializer,
+        'retrieve': RecipeReadSerializer,
+    }
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            cursor_param = self.cursor_pagination_class.cursor_query_param
+            if cursor_param in self.request.query_params:
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
 
     def get_serializer_class(self):
-        if self.request.method in SAFE_METHODS:
-            return RecipeReadSerializer
-        return RecipeWriteSerializer
+        return self.serializer_classes.get(self.action, RecipeWriteSerializer)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in self.serializer_classes:
+            context['subscribed_ids'] = self.get_subscribed_ids()
+        return context
+
+    def get_subscribed_ids(self):
+        if not hasattr(self, '_subscribed_ids'):
+            user = self.request.user
+            self._subscribed_ids = set()
+            if user.is_authenticated:
+                self._subscribed_ids = set(
+                    Follow.objects.filter(user=user).order_by().values_list(
+                        'author_id', flat=True))
+        return self._subscribed_ids
 
     def get_queryset(self):
+        if self.action in self.serializer_classes:
+            return self.get_read_queryset()
+        return Recipe.objects.all()
+
+    def get_read_queryset(self):
         user = self.request.user
-        queryset = Recipe.objects.all()
+        queryset = Recipe.objects.select_related('author').prefetch_related(
+            'tags',
+            Prefetch(
+                'ingredient',
+                queryset=IngredientAmount.objects.select_related(
+                    'ingredients').only(
+                        'recipe', 'amount', 'ingredients__name',
+                        'ingredients__measurement_unit'
+                ).order_by('ingredients__name')
+            )
+        )
+        if self.action == 'list':
+            queryset = queryset.only(*RECIPE_LIST_FIELDS)
 
         if user.is_authenticated:
             queryset = queryset.annotate(
-                is_favorited=Exists(Favorite.objects.filter(
-                    user=user, recipe__pk=OuterRef('pk'))
-                ),
-                is_in_shopping_cart=Exists(Cart.objects.filter(
-                    user=user, recipe__pk=OuterRef('pk'))
-                )
+                is_favorited=self.get_flag_annotation(Favorite, user),
+                is_in_shopping_cart=self.get_flag_annotation(Cart, user)
             )
         else:
             queryset = queryset.annotate(
@@ -121,6 +197,48 @@ class RecipeViewSet(viewsets.ModelViewSet):
             )
         return queryset
 
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        return self.get_read_response(
+            serializer.instance, HTTPStatus.CREATED)
+
+    def update(self, request, *args, **kwargs):
+        partial = kwargs.pop('partial', False)
+        serializer = self.get_serializer(
+            self.get_object(), data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+        return self.get_read_response(serializer.instance, HTTPStatus.OK)
+
+    def get_read_response(self, instance, status):
+        recipe = self.get_read_queryset().get(pk=instance.pk)
+        context = self.get_serializer_context()
+        context['subscribed_ids'] = self.get_subscribed_ids()
+        serializer = RecipeReadSerializer(recipe, context=context)
+        return Response(serializer.data, status=status)
+
+    def get_flag_annotation(self, model, user):
+        recipe_ids = self.get_flag_ids(model, user)
+        if len(recipe_ids) > FLAG_RECIPE_IDS_LIMIT:
+            return Exists(model.objects.filter(
+                user=user, recipe=OuterRef('pk')))
+        return Case(
+            When(pk__in=recipe_ids, then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField()
+        )
+
+    def get_flag_ids(self, model, user):
+        if not hasattr(self, '_flag_ids'):
+            self._flag_ids = {}
+        if model not in self._flag_ids:
+            self._flag_ids[model] = set(
+                model.objects.filter(user=user).order_by().values_list(
+                    'recipe_id', flat=True)[:FLAG_RECIPE_IDS_LIMIT + 1])
+        return self._flag_ids[model]
+
     @action(detail=True, methods=['post'],
             permission_classes=[IsAuthenticated])
     def favorite(self, request, pk=None):
@@ -140,19 +258,20 @@ class RecipeViewSet(viewsets.ModelViewSet):
         return self.delete_obj(Cart, request.user, pk)
 
     def add_obj(self, model, user, pk):
-        if model.objects.filter(user=user, recipe__id=pk).exists():
+        recipe = get_object_or_404(
+            Recipe.objects.only('id', 'name', 'image', 'cooking_time'),
+            id=pk)
+        _, created = model.objects.get_or_create(user=user, recipe=recipe)
+        if not created:
             return Response({
                 'errors': 'Ошибка добавления рецепта в список'
             }, status=HTTPStatus.BAD_REQUEST)
-        recipe = get_object_or_404(Recipe, id=pk)
-        model.objects.create(user=user, recipe=recipe)
         serializer = ShortRecipeSerializer(recipe)
         return Response(serializer.data, status=HTTPStatus.CREATED)
 
     def delete_obj(self, model, user, pk):
-        obj = model.objects.filter(user=user, recipe__id=pk)
-        if obj.exists():
-            obj.delete()
+        deleted, _ = model.objects.filter(user=user, recipe_id=pk).delete()
+        if deleted:
             return Response(status=HTTPStatus.NO_CONTENT)
         return Response({
             'errors': 'Ошибка удаления рецепта из списка'
@@ -160,18 +279,19 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
     @action(
         detail=False, methods=['get'], permission_classes=[IsAuthenticated])
-    def download_shopping_cart(self, request): 
-        ingredients = IngredientAmount.objects.filter( 
+    def download_shopping_cart(self, request):
+        ingredients = IngredientAmount.objects.filter(
             recipe__cart__user=request.user).values(
-                'ingredients__name', 
+                'ingredients__name',
                 'ingredients__measurement_unit').order_by(
-                'ingredients__name').annotate(total=Sum('amount')) 
-        shopping_cart = '\n'.join([ 
-            f'{ingredient["ingredients__name"]} - {ingredient["total"]} ' 
-            f'{ingredient["ingredients__measurement_unit"]}' 
-            for ingredient in ingredients 
-        ]) 
-        filename = 'shopping_cart.txt' 
-        response = HttpResponse(shopping_cart, content_type='text/plain') 
-        response['Content-Disposition'] = f'attachment; filename={filename}' 
+                'ingredients__name').annotate(total=Sum('amount'))
+        shopping_cart = (
+            f'{ingredient["ingredients__name"]} - {ingredient["total"]} '
+            f'{ingredient["ingredients__measurement_unit"]}\n'
+            for ingredient in ingredients.iterator()
+        )
+        filename = 'shopping_cart.txt'
+        response = StreamingHttpResponse(
+            shopping_cart, content_type='text/plain')
+        response['Content-Disposition'] = f'attachment; filename={filename}'
         return response
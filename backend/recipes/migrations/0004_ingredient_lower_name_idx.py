@@ -0,0 +1,19 @@
+from django.contrib.postgres.indexes import OpClass
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0003_auto_20220428_2047'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(
+                OpClass(Lower('name'), name='text_pattern_ops'),
+                name='ingredient_lower_name_idx'),
+        ),
+    ]
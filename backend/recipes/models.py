@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import OpClass
 from django.core import validators
 from django.db import models
+from django.db.models.functions import Lower
 
 User = get_user_model()
 
@@ -35,6 +37,9 @@ class Ingredient(models.Model):
         constraints = [
             models.UniqueConstraint(fields=['name', 'measurement_unit'],
                                     name='unique_for_ingredient')]
+        indexes = [
+            models.Index(OpClass(Lower('name'), name='text_pattern_ops'),
+                         name='ingredient_lower_name_idx')]
 
     def __str__(self):
         return f'{self.name}'
@@ -75,6 +80,9 @@ class Recipe(models.Model):
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
         ordering = ('-pub_date', )
+        indexes = [
+            models.Index(fields=['-pub_date', '-id'],
+                         name='recipe_pub_date_id_idx')]
 
     def __str__(self):
         return f'{self.name}'